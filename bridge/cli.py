@@ -11,33 +11,30 @@ from __future__ import annotations
 import argparse
 import asyncio
 import logging
-import platform
-import ssl
 import sys
 
-import certifi
-import httpx
-import websockets
-
 from bridge import __version__
-from bridge.config import load_config, save_config, get_config_path, _DEFAULTS, detect_openclaw_config
-from bridge.client import BridgeClient
-from bridge.launcher import OpenClawLauncher
-from bridge.openclaw import OpenClawClient
+from bridge.config import load_config, save_config, get_config_path, DEFAULTS, detect_openclaw_config
+
+_IS_WINDOWS = sys.platform == "win32"
 
 
 def _setup_windows():
     """Apply Windows-specific runtime fixes."""
-    if platform.system() != "Windows":
+    if not _IS_WINDOWS:
         return
 
-    # Force UTF-8 console output to avoid garbled text on non-UTF-8 codepages
-    if hasattr(sys.stdout, "reconfigure"):
-        sys.stdout.reconfigure(encoding="utf-8", errors="replace")
-        sys.stderr.reconfigure(encoding="utf-8", errors="replace")
+    # Force UTF-8 console output to avoid garbled text on non-UTF-8 codepages.
+    # Modern terminals are often UTF-8 already; reconfiguring those would
+    # just flush and rebuild the stream for nothing.
+    for stream in (sys.stdout, sys.stderr):
+        encoding = (getattr(stream, "encoding", None) or "").lower()
+        if hasattr(stream, "reconfigure") and encoding not in ("utf-8", "utf8"):
+            stream.reconfigure(encoding="utf-8", errors="replace")
 
-    # Use SelectorEventLoop for websockets compatibility on Windows
-    asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    # Keep the default IOCP-based ProactorEventLoop: websockets >= 10 (we
+    # require >= 12) runs on it, so the SelectorEventLoop workaround is no
+    # longer needed.
 
 
 class _ColorFormatter(logging.Formatter):
@@ -74,7 +71,7 @@ class _ColorFormatter(logging.Formatter):
 
 def _enable_windows_ansi():
     """Enable ANSI escape code support on Windows 10+."""
-    if sys.platform != "win32":
+    if not _IS_WINDOWS:
         return True
     try:
         import ctypes
@@ -93,7 +90,7 @@ def _enable_windows_ansi():
 
 def _setup_logging():
     use_color = sys.stderr.isatty()
-    if use_color and sys.platform == "win32":
+    if use_color and _IS_WINDOWS:
         use_color = _enable_windows_ansi()
 
     handler = logging.StreamHandler()
@@ -108,12 +105,23 @@ def _setup_logging():
 # Validation helpers
 # ---------------------------------------------------------------------------
 
-def _make_ssl_context() -> ssl.SSLContext:
-    """Create an SSL context using certifi CA bundle.
+_SSL_CTX = None
+
+
+def _make_ssl_context() -> "ssl.SSLContext":
+    """Return a shared SSL context using certifi CA bundle.
 
     Needed for PyInstaller builds where the system CA store may be absent.
+    Built once per process since loading the CA bundle is not cheap.
     """
-    return ssl.create_default_context(cafile=certifi.where())
+    global _SSL_CTX
+    if _SSL_CTX is None:
+        import ssl
+
+        import certifi
+
+        _SSL_CTX = ssl.create_default_context(cafile=certifi.where())
+    return _SSL_CTX
 
 
 async def _check_ws_reachable(url: str) -> tuple[bool, str]:
@@ -122,6 +130,8 @@ async def _check_ws_reachable(url: str) -> tuple[bool, str]:
     The server will likely close with 4001 (no api_key), but a successful
     TCP + WS handshake proves the address is valid and reachable.
     """
+    import websockets
+
     ssl_ctx = _make_ssl_context() if url.startswith("wss://") else None
     try:
         async with websockets.connect(url, open_timeout=5, ssl=ssl_ctx):
@@ -152,44 +162,71 @@ async def _check_ws_reachable(url: str) -> tuple[bool, str]:
 async def _check_api_key(cloud_url: str, api_key: str) -> tuple[bool, str]:
     """Verify the API key by connecting with it to the cloud WebSocket.
 
-    If the server closes with code 4001, the key is invalid/revoked.
-    If the connection stays open, the key is valid.
+    Only a definitive rejection (close code 4001, HTTP 401/403) fails the
+    check.  The server may reset connections before the WebSocket handshake
+    completes, so other connection errors are inconclusive and pass —
+    reachability itself is reported by _check_ws_reachable.
     """
+    import websockets
+
     url = f"{cloud_url}?api_key={api_key}"
     ssl_ctx = _make_ssl_context() if cloud_url.startswith("wss://") else None
     try:
         async with websockets.connect(url, open_timeout=5, ssl=ssl_ctx) as ws:
-            # Connection stayed open — key is valid
-            await ws.close()
+            # A bad key may pass the handshake and then be closed with 4001;
+            # give the server a moment to do that before accepting the key.
+            try:
+                await asyncio.wait_for(ws.recv(), 1)
+            except asyncio.TimeoutError:
+                pass
             return True, ""
-    except websockets.exceptions.ConnectionClosedError as e:
-        if e.code == 4001:
+    except websockets.exceptions.ConnectionClosed as e:
+        if e.rcvd is not None and e.rcvd.code == 4001:
             return False, "API key is invalid or revoked"
-        return False, f"Connection closed unexpectedly (code={e.code}): {e.reason}"
-    except websockets.exceptions.InvalidStatus as e:
+        return True, ""
+    except (
+        websockets.exceptions.InvalidStatusCode,
+        websockets.exceptions.InvalidStatus,
+    ) as e:
+        # The legacy client (websockets < 14) raises InvalidStatusCode
         status = getattr(e, "status_code", None) or getattr(e.response, "status_code", None)
         if status == 401 or status == 403:
             return False, "API key is invalid or revoked"
-        return False, f"Server rejected connection (HTTP {status})"
-    except (ConnectionRefusedError, OSError) as e:
-        return False, f"Cannot connect to server: [{type(e).__name__}] {e}"
-    except asyncio.TimeoutError:
-        return False, "Connection timed out"
-    except Exception as e:
-        return False, f"Connection failed: {e}"
+        return True, ""
+    except (
+        OSError,
+        asyncio.TimeoutError,
+        websockets.exceptions.InvalidHandshake,
+        websockets.exceptions.InvalidURI,
+    ):
+        # Inconclusive; URL problems are reported by _check_ws_reachable
+        return True, ""
+
+
+async def _check_cloud(cloud_url: str, api_key: str) -> list[str]:
+    """Probe URL reachability and the API key concurrently.
+
+    Returns the error messages of every failed check (empty if all passed).
+    """
+    results = await asyncio.gather(
+        _check_ws_reachable(cloud_url), _check_api_key(cloud_url, api_key),
+    )
+    return [err for ok, err in results if not ok]
 
 
 def _validate_cloud_url(url: str) -> tuple[bool, str]:
-    """Validate cloud WebSocket URL format and reachability."""
+    """Validate cloud WebSocket URL format.
+
+    Reachability is checked together with the API key by _check_cloud.
+    """
     if not url.startswith(("ws://", "wss://")):
         return False, "URL must start with ws:// or wss://"
-    return asyncio.run(_check_ws_reachable(url))
+    return True, ""
 
 
-def _validate_api_key(api_key: str, cloud_url: str) -> tuple[bool, str]:
-    """Validate API key format. Connectivity check is skipped because the
-    server may reset connections before the WebSocket handshake completes,
-    making it impossible to distinguish valid from invalid keys."""
+def _validate_api_key(api_key: str) -> tuple[bool, str]:
+    """Validate API key format. Server-side verification is done by
+    _check_cloud once the cloud URL is known as well."""
     if not api_key.startswith("evo_"):
         return False, "API key must start with 'evo_'"
     if len(api_key) < 10:
@@ -197,21 +234,17 @@ def _validate_api_key(api_key: str, cloud_url: str) -> tuple[bool, str]:
     return True, ""
 
 
-def _validate_openclaw_url(url: str) -> tuple[bool, str]:
-    """Validate OpenClaw URL format and check health endpoint."""
+def _validate_openclaw_url(url: str, token: str = "") -> tuple[bool, str]:
+    """Validate OpenClaw URL format and check health endpoint.
+
+    Uses the same health check cmd_run relies on, so "healthy" means the
+    same thing in the wizard and at startup.
+    """
     if not url.startswith(("http://", "https://")):
         return False, "URL must start with http:// or https://"
-    try:
-        resp = httpx.get(f"{url.rstrip('/')}/v1/models", timeout=5.0)
-        if resp.status_code == 200:
-            return True, ""
-        return False, f"OpenClaw returned HTTP {resp.status_code}"
-    except httpx.ConnectError:
-        return False, f"Cannot connect to OpenClaw at {url}"
-    except httpx.TimeoutException:
-        return False, f"Connection timed out for {url}"
-    except Exception as e:
-        return False, f"Health check failed: {e}"
+    from bridge.openclaw import OpenClawClient
+
+    return OpenClawClient(base_url=url, token=token, agent_id="_probe").check_health()
 
 
 def _prompt_with_validation(
@@ -254,28 +287,60 @@ def _run_config_wizard(force: bool = False) -> dict:
 
     print("=== wizclaw setup ===\n")
 
-    # --- Cloud WebSocket URL (format + reachability) ---
-    default_cloud = cfg.get("cloud_url", _DEFAULTS["cloud_url"])
-    cloud_url = _prompt_with_validation(
-        prompt=f"Cloud WebSocket URL [{default_cloud}]: ",
-        default=default_cloud,
-        validate_fn=_validate_cloud_url,
-    )
-    cfg = {**cfg, "cloud_url": cloud_url}
+    # One event loop serves every async validation in the wizard, so retries
+    # don't pay for a fresh loop each time.
+    loop = asyncio.new_event_loop()
+    try:
+        cfg = _prompt_config(cfg, loop)
+    finally:
+        loop.close()
 
-    # --- API Key (format + server verification) ---
-    api_key = _prompt_with_validation(
-        prompt="API Key (evo_...): ",
-        default=cfg.get("api_key", _DEFAULTS["api_key"]),
-        validate_fn=lambda key: _validate_api_key(key, cloud_url),
-    )
-    cfg = {**cfg, "api_key": api_key}
+    save_config(cfg)
+    print(f"\nConfig saved to {get_config_path()}")
+    return cfg
+
+
+def _prompt_config(cfg: dict, loop: asyncio.AbstractEventLoop) -> dict:
+    """Interactively prompt for every setting, updating cfg in place."""
+    # Values from a previously completed wizard run were validated then;
+    # re-accepting them should not cost another network round-trip.
+    previous = dict(cfg) if cfg.get("api_key") else {}
+
+    # --- Cloud WebSocket URL + API Key (format, then one batched server check) ---
+    while True:
+        default_cloud = cfg.get("cloud_url", DEFAULTS["cloud_url"])
+        cloud_url = _prompt_with_validation(
+            prompt=f"Cloud WebSocket URL [{default_cloud}]: ",
+            default=default_cloud,
+            validate_fn=_validate_cloud_url,
+        )
+        cfg["cloud_url"] = cloud_url
+
+        api_key = _prompt_with_validation(
+            prompt="API Key (evo_...): ",
+            default=cfg.get("api_key", DEFAULTS["api_key"]),
+            validate_fn=_validate_api_key,
+        )
+        cfg["api_key"] = api_key
+
+        if (cloud_url == previous.get("cloud_url")
+                and api_key == previous.get("api_key")):
+            break
+        errors = loop.run_until_complete(_check_cloud(cloud_url, api_key))
+        if not errors:
+            break
+        for err in errors:
+            print(f"  ERROR: {err}")
+        print("  Please try again.\n")
 
     # --- Auto-detect OpenClaw settings from ~/.openclaw/openclaw.json ---
     detected = detect_openclaw_config()
 
     # --- OpenClaw URL (format + health check, with skip option) ---
-    default_openclaw = cfg.get("openclaw_url", _DEFAULTS["openclaw_url"])
+    default_openclaw = cfg.get("openclaw_url", DEFAULTS["openclaw_url"])
+    # The token prompt comes later; probe with whatever token we already
+    # know so an auth-protected gateway doesn't look unreachable.
+    probe_token = cfg.get("openclaw_token") or detected.get("token", "")
     if detected.get("url"):
         default_openclaw = detected["url"]
         print(f"  (Auto-detected OpenClaw at {default_openclaw})")
@@ -289,12 +354,19 @@ def _run_config_wizard(force: bool = False) -> dict:
         if not raw:
             raw = default_openclaw
         if raw.lower() == "skip":
-            cfg = {**cfg, "openclaw_url": default_openclaw}
+            cfg["openclaw_url"] = default_openclaw
+            cfg["openclaw_url_verified"] = False
             print(f"  Skipping connectivity check. Using: {default_openclaw}")
             break
-        ok, err = _validate_openclaw_url(raw)
+        # Only a URL that passed the health check on a previous run can be
+        # re-accepted without probing; a skipped one is checked now.
+        if raw == previous.get("openclaw_url") and previous.get("openclaw_url_verified"):
+            cfg["openclaw_url"] = raw
+            break
+        ok, err = _validate_openclaw_url(raw, probe_token)
         if ok:
-            cfg = {**cfg, "openclaw_url": raw}
+            cfg["openclaw_url"] = raw
+            cfg["openclaw_url_verified"] = True
             break
         print(f"  ERROR: {err}")
         print("  Enter a valid URL or 'skip' to skip.\n")
@@ -303,7 +375,7 @@ def _run_config_wizard(force: bool = False) -> dict:
     if not cfg.get("openclaw_token") and detected.get("token"):
         detected_token = detected["token"]
         print(f"  Auto-detected OpenClaw token: {detected_token[:8]}...")
-        cfg = {**cfg, "openclaw_token": detected_token}
+        cfg["openclaw_token"] = detected_token
     else:
         token_display = "****" if cfg.get("openclaw_token") else "none"
         try:
@@ -314,12 +386,12 @@ def _run_config_wizard(force: bool = False) -> dict:
             print("\nConfiguration cancelled.")
             sys.exit(1)
         if openclaw_token.lower() == "clear":
-            cfg = {**cfg, "openclaw_token": ""}
+            cfg["openclaw_token"] = ""
         elif openclaw_token:
-            cfg = {**cfg, "openclaw_token": openclaw_token}
+            cfg["openclaw_token"] = openclaw_token
 
     # --- OpenClaw Agent ID (has default, no connectivity check) ---
-    default_agent = cfg.get("openclaw_agent_id", _DEFAULTS["openclaw_agent_id"])
+    default_agent = cfg.get("openclaw_agent_id", DEFAULTS["openclaw_agent_id"])
     try:
         agent_id = input(f"OpenClaw Agent ID [{default_agent}]: ").strip()
     except (KeyboardInterrupt, EOFError):
@@ -327,10 +399,7 @@ def _run_config_wizard(force: bool = False) -> dict:
         sys.exit(1)
     if not agent_id:
         agent_id = default_agent
-    cfg = {**cfg, "openclaw_agent_id": agent_id}
-
-    save_config(cfg)
-    print(f"\nConfig saved to {get_config_path()}")
+    cfg["openclaw_agent_id"] = agent_id
     return cfg
 
 
@@ -389,6 +458,12 @@ def _ensure_chat_completions_enabled():
 
 def cmd_run(_args):
     """Default command: auto-config + ensure OpenClaw + connect to cloud."""
+    # Imported here so `wizclaw version` / `wizclaw config` skip loading
+    # websockets and httpx.
+    from bridge.client import BridgeClient
+    from bridge.launcher import OpenClawLauncher
+    from bridge.openclaw import OpenClawClient
+
     cfg = load_config()
 
     # Step 0a: Auto-enable chatCompletions endpoint if disabled
@@ -402,7 +477,7 @@ def cmd_run(_args):
             logging.getLogger("wizclaw.cli").info(
                 "Auto-detected OpenClaw token from ~/.openclaw/openclaw.json"
             )
-        if detected.get("url") and cfg.get("openclaw_url") == _DEFAULTS["openclaw_url"]:
+        if detected.get("url") and cfg.get("openclaw_url") == DEFAULTS["openclaw_url"]:
             cfg["openclaw_url"] = detected["url"]
 
     # Step 1: first-run configuration wizard if no API key
@@ -445,7 +520,8 @@ def cmd_run(_args):
     print(f"  Config:   {get_config_path()}")
     print()
 
-    client = BridgeClient(cfg)
+    ssl_ctx = _make_ssl_context() if cfg["cloud_url"].startswith("wss://") else None
+    client = BridgeClient(cfg, ssl_context=ssl_ctx)
     try:
         asyncio.run(client.run())
     except KeyboardInterrupt:
@@ -459,10 +535,14 @@ def cmd_run(_args):
 # Argument parser
 # ---------------------------------------------------------------------------
 
-def main():
-    _setup_windows()
-    _setup_logging()
+def _add_config_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--force", action="store_true", help="Overwrite existing config",
+    )
 
+
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the full parser (only needed for --help and unknown input)."""
     parser = argparse.ArgumentParser(
         prog="wizclaw",
         description="Bridge daemon connecting local OpenClaw to the cloud",
@@ -473,22 +553,45 @@ def main():
     config_parser = subparsers.add_parser(
         "config", help="Re-run the configuration wizard",
     )
-    config_parser.add_argument(
-        "--force", action="store_true", help="Overwrite existing config",
-    )
+    _add_config_arguments(config_parser)
 
     # wizclaw version
     subparsers.add_parser("version", help="Show version")
+    return parser
 
-    args = parser.parse_args()
 
-    if args.command == "config":
-        cmd_config(args)
-    elif args.command == "version":
-        cmd_version(args)
-    else:
+def main():
+    argv = sys.argv[1:]
+
+    # `wizclaw version` needs neither console setup nor logging
+    if argv == ["version"]:
+        cmd_version(None)
+        return
+
+    _setup_windows()
+    _setup_logging()
+
+    # Dispatch on argv directly and only build the parser that is actually
+    # needed; the default run path never touches argparse.
+    if not argv:
         # Default: no subcommand → run the bridge
-        cmd_run(args)
+        cmd_run(None)
+    elif argv[0] == "config":
+        config_parser = argparse.ArgumentParser(
+            prog="wizclaw config",
+            description="Re-run the configuration wizard",
+        )
+        _add_config_arguments(config_parser)
+        cmd_config(config_parser.parse_args(argv[1:]))
+    else:
+        # --help, typos, etc.: let the full parser report them
+        args = _build_parser().parse_args(argv)
+        if args.command == "config":
+            cmd_config(args)
+        elif args.command == "version":
+            cmd_version(args)
+        else:
+            cmd_run(args)
 
 
 if __name__ == "__main__":
@@ -1,7 +1,8 @@
 """WebSocket client that connects the local bridge daemon to the cloud."""
 
+from __future__ import annotations
+
 import asyncio
-import json
 import logging
 import platform
 import ssl
@@ -9,6 +10,7 @@ import time
 import uuid
 
 import certifi
+import orjson
 import websockets
 
 from bridge import __version__
@@ -16,11 +18,27 @@ from bridge.openclaw import OpenClawClient
 
 logger = logging.getLogger("wizclaw.client")
 
+# WebSocket buffer sizes: large tool responses go out in fewer writes and
+# big inbound frames are read with fewer syscalls than with the defaults.
+_WS_MAX_SIZE = 16 * 2**20
+_WS_READ_LIMIT = 2**20
+_WS_WRITE_LIMIT = 2**20
+
+
+def _dumps(obj) -> str:
+    """Serialize to a str so messages keep going out as text frames."""
+    return orjson.dumps(obj).decode()
+
+
+# Pre-serialized heartbeat messages
+_PING = _dumps({"type": "ping"})
+_PONG = _dumps({"type": "pong"})
+
 
 class BridgeClient:
     """Connects to the cloud WS endpoint, forwards tool requests to OpenClaw."""
 
-    def __init__(self, config: dict):
+    def __init__(self, config: dict, ssl_context: ssl.SSLContext | None = None):
         self.cloud_url = config["cloud_url"]
         self.api_key = config["api_key"]
         self.reconnect_max = config.get("reconnect_interval_max", 30)
@@ -31,8 +49,20 @@ class BridgeClient:
             agent_id=config.get("openclaw_agent_id", "main"),
             timeout=self.request_timeout,
         )
+        # Computed once and reused across reconnects
+        self._connect_url = f"{self.cloud_url}?api_key={self.api_key}"
+        if ssl_context is None and self.cloud_url.startswith("wss://"):
+            ssl_context = ssl.create_default_context(cafile=certifi.where())
+        self._ssl_ctx = ssl_context
 
     async def run(self):
+        """Run until cancelled, then release pooled OpenClaw connections."""
+        try:
+            await self._run_forever()
+        finally:
+            await self.openclaw.aclose()
+
+    async def _run_forever(self):
         """Main loop with exponential-backoff reconnection."""
         backoff = 1
         attempt = 0
@@ -59,14 +89,17 @@ class BridgeClient:
             backoff = min(backoff * 2, self.reconnect_max)
 
     async def _connect_and_listen(self):
-        url = f"{self.cloud_url}?api_key={self.api_key}"
         logger.info("Connecting to %s", self.cloud_url)
 
-        ssl_ctx = None
-        if self.cloud_url.startswith("wss://"):
-            ssl_ctx = ssl.create_default_context(cafile=certifi.where())
-
-        async with websockets.connect(url, ping_interval=30, ping_timeout=10, ssl=ssl_ctx) as ws:
+        async with websockets.connect(
+            self._connect_url,
+            ping_interval=30,
+            ping_timeout=10,
+            ssl=self._ssl_ctx,
+            max_size=_WS_MAX_SIZE,
+            read_limit=_WS_READ_LIMIT,
+            write_limit=_WS_WRITE_LIMIT,
+        ) as ws:
             logger.info("[STATE] Connected to cloud ✓")
             await self._send_status(ws)
 
@@ -96,13 +129,15 @@ class BridgeClient:
         """Send application-level ping every 25s to keep reverse proxy alive."""
         while True:
             await asyncio.sleep(25)
-            await ws.send(json.dumps({"type": "ping"}))
+            await ws.send(_PING)
             logger.debug("[HEARTBEAT] ping sent")
 
-    async def _handle_message(self, ws, raw: str):
+    async def _handle_message(self, ws, raw: str | bytes):
+        # Text frames arrive as str and binary frames as bytes; both orjson
+        # and json parse either directly, so no transcoding is done here.
         try:
-            msg = json.loads(raw)
-        except json.JSONDecodeError:
+            msg = orjson.loads(raw)
+        except orjson.JSONDecodeError:
             logger.warning("Bad JSON from cloud: %s", raw[:200])
             return
 
@@ -116,45 +151,53 @@ class BridgeClient:
             await self._handle_tool_request(ws, request_id, tool_name, arguments)
 
         elif msg_type == "ping":
-            await ws.send(json.dumps({"type": "pong"}))
+            await ws.send(_PONG)
 
         else:
             logger.debug("Unknown message type: %s", msg_type)
 
     async def _handle_tool_request(self, ws, request_id: str, tool_name: str, arguments: dict):
         """Execute a tool request and send the response back."""
-        t_recv = time.time()
-        logger.info("[TIMING] tool_request RECEIVED id=%s tool=%s", request_id, tool_name)
-
-        response = {
-            "type": "tool_response",
-            "request_id": request_id,
-            "success": False,
-            "result": None,
-            "error": None,
-        }
-
+        # Per-request timing is diagnostic only; skip the clock reads and
+        # log records entirely unless DEBUG logging is on.
+        timing = logger.isEnabledFor(logging.DEBUG)
+        if timing:
+            t_recv = time.monotonic()
+            logger.debug("[TIMING] tool_request RECEIVED id=%s tool=%s", request_id, tool_name)
+
+        success = False
+        result = None
+        error = None
         try:
             if tool_name == "local_openclaw":
                 query = arguments.get("query", "")
-                logger.info("[TIMING] OpenClaw query START id=%s", request_id)
+                if timing:
+                    logger.debug("[TIMING] OpenClaw query START id=%s", request_id)
                 result = await self.openclaw.aquery(query)
-                t_oclaw = time.time()
-                logger.info("[TIMING] OpenClaw query DONE id=%s (%.3fs)", request_id, t_oclaw - t_recv)
-                response["success"] = True
-                response["result"] = result
+                if timing:
+                    t_oclaw = time.monotonic()
+                    logger.debug("[TIMING] OpenClaw query DONE id=%s (%.3fs)", request_id, t_oclaw - t_recv)
+                success = True
             else:
-                response["error"] = f"Unsupported tool: {tool_name}"
+                error = f"Unsupported tool: {tool_name}"
         except ConnectionError as e:
-            response["error"] = f"OpenClaw unreachable: {e}"
+            error = f"OpenClaw unreachable: {e}"
             logger.error("OpenClaw unreachable: %s", e)
         except Exception as e:
-            response["error"] = f"Tool execution failed: {e}"
+            error = f"Tool execution failed: {e}"
             logger.error("Tool execution failed: %s", e, exc_info=True)
 
-        await ws.send(json.dumps(response))
-        t_sent = time.time()
-        logger.info("[TIMING] tool_response SENT id=%s success=%s (%.3fs total since recv)", request_id, response["success"], t_sent - t_recv)
+        response = {
+            "type": "tool_response",
+            "request_id": request_id,
+            "success": success,
+            "result": result,
+            "error": error,
+        }
+        await ws.send(_dumps(response))
+        if timing:
+            t_sent = time.monotonic()
+            logger.debug("[TIMING] tool_response SENT id=%s success=%s (%.3fs total since recv)", request_id, success, t_sent - t_recv)
 
     async def _send_status(self, ws):
         """Send status message after connecting."""
@@ -166,7 +209,7 @@ class BridgeClient:
             "hostname": platform.node(),
             "machine_id": self._get_machine_id(),
         }
-        await ws.send(json.dumps(status))
+        await ws.send(_dumps(status))
         logger.info("Status sent: openclaw=%s hostname=%s", status["openclaw_status"], status["hostname"])
 
     @staticmethod
@@ -1,20 +1,24 @@
 """Configuration management for wizclaw bridge daemon.
 
 Config lives at:
-    - Windows: %APPDATA%\\wizclaw\\config.yaml
-    - Unix:    ~/.wizclaw/config.yaml
+    - Windows: %APPDATA%\\wizclaw\\config.json
+    - Unix:    ~/.wizclaw/config.json
+
+Older releases wrote config.yaml; it is read once and migrated to JSON.
 """
 
+from __future__ import annotations
+
+import json
 import os
-import platform
+import sys
 from pathlib import Path
-
-import yaml
+from types import MappingProxyType
 
 
 def _get_config_dir() -> Path:
     """Return the platform-appropriate config directory."""
-    if platform.system() == "Windows":
+    if sys.platform == "win32":
         appdata = os.environ.get("APPDATA")
         if appdata:
             return Path(appdata) / "wizclaw"
@@ -22,60 +26,122 @@ def _get_config_dir() -> Path:
 
 
 CONFIG_DIR = _get_config_dir()
-CONFIG_FILE = CONFIG_DIR / "config.yaml"
+CONFIG_FILE = CONFIG_DIR / "config.json"
+_LEGACY_CONFIG_FILE = CONFIG_DIR / "config.yaml"
 
 _DEFAULTS = {
     "cloud_url": "wss://stackme.cloud/ws/bridge",
     "api_key": "",
     "openclaw_url": "http://localhost:18789",
+    # True only if openclaw_url passed the wizard's health check (not "skip")
+    "openclaw_url_verified": False,
     "openclaw_token": "",
     "openclaw_agent_id": "main",
     "openclaw_auto_start": True,
     "reconnect_interval_max": 10,
     "request_timeout": 120,
 }
+# Read-only view for other modules; load_config() copies _DEFAULTS instead
+DEFAULTS = MappingProxyType(_DEFAULTS)
+_KNOWN_KEYS = frozenset(_DEFAULTS)
+
+# (mtime_ns, merged config) of the last successful load_config()
+_CACHE: tuple[int, dict] | None = None
 
 
 def load_config() -> dict:
-    """Load config from disk, falling back to defaults for missing keys."""
-    if not CONFIG_FILE.exists():
+    """Load config from disk, falling back to defaults for missing keys.
+
+    The parsed result is cached until the file's mtime changes; callers
+    always get a fresh copy they are free to mutate.
+    """
+    global _CACHE
+    try:
+        mtime = CONFIG_FILE.stat().st_mtime_ns
+    except FileNotFoundError:
+        if _LEGACY_CONFIG_FILE.exists():
+            return _migrate_legacy_config()
         return dict(_DEFAULTS)
+    if _CACHE is not None and _CACHE[0] == mtime:
+        return dict(_CACHE[1])
     with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-        user_cfg = yaml.safe_load(f) or {}
-    known_keys = set(_DEFAULTS.keys())
-    merged = dict(_DEFAULTS)
-    merged.update({k: v for k, v in user_cfg.items() if v is not None and k in known_keys})
+        user_cfg = json.load(f) or {}
+    merged = _merge_defaults(user_cfg)
+    _CACHE = (mtime, merged)
+    return dict(merged)
+
+
+def _merge_defaults(user_cfg: dict) -> dict:
+    """Overlay known, non-null user settings on top of the defaults."""
+    merged = _DEFAULTS.copy()
+    for k, v in user_cfg.items():
+        if v is not None and k in _KNOWN_KEYS:
+            merged[k] = v
+    return merged
+
+
+def _migrate_legacy_config() -> dict:
+    """Read a config.yaml written by an older release and rewrite it as JSON."""
+    import yaml
+
+    try:
+        from yaml import CSafeLoader as _Loader
+    except ImportError:
+        from yaml import SafeLoader as _Loader
+
+    # libyaml parses UTF-8 bytes directly; skip the text-mode decode
+    with open(_LEGACY_CONFIG_FILE, "rb") as f:
+        user_cfg = yaml.load(f, Loader=_Loader) or {}
+    merged = _merge_defaults(user_cfg)
+    save_config(merged)
     return merged
 
 
 def save_config(cfg: dict) -> None:
     """Persist config to disk with owner-only permissions."""
+    global _CACHE
+    _CACHE = None
     CONFIG_DIR.mkdir(parents=True, exist_ok=True)
     if os.name != "nt":
         CONFIG_DIR.chmod(0o700)
-    with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-        yaml.dump(cfg, f, default_flow_style=False, allow_unicode=True)
+    # Serialize first, then swap the file in atomically so a crash never
+    # leaves a truncated config behind.
+    data = json.dumps(cfg, indent=2, ensure_ascii=False).encode("utf-8")
+    tmp = CONFIG_FILE.with_suffix(".json.tmp")
+    tmp.write_bytes(data)
     if os.name != "nt":
-        CONFIG_FILE.chmod(0o600)
+        tmp.chmod(0o600)
+    os.replace(tmp, CONFIG_FILE)
 
 
 def get_config_path() -> str:
     return str(CONFIG_FILE)
 
 
+# (mtime_ns, size, result) of the last detect_openclaw_config() parse
+_OPENCLAW_CACHE: tuple[int, int, dict] | None = None
+
+
 def detect_openclaw_config() -> dict:
     """Auto-detect OpenClaw settings from its config file.
 
     Reads ~/.openclaw/openclaw.json and extracts gateway port and auth token.
     Returns dict with keys: url, token, port (any may be absent).
+    The result is cached until the file's mtime or size changes.
     """
-    import json
+    global _OPENCLAW_CACHE
+    import orjson  # imported here to keep it off the `wizclaw version` path
 
     config_path = Path.home() / ".openclaw" / "openclaw.json"
-    if not config_path.exists():
+    try:
+        st = config_path.stat()
+    except OSError:
         return {}
+    if (_OPENCLAW_CACHE is not None
+            and _OPENCLAW_CACHE[:2] == (st.st_mtime_ns, st.st_size)):
+        return dict(_OPENCLAW_CACHE[2])
     try:
-        data = json.loads(config_path.read_text(encoding="utf-8"))
+        data = orjson.loads(config_path.read_bytes())
         result = {}
         gateway = data.get("gateway", {})
         port = gateway.get("port")
@@ -85,6 +151,7 @@ def detect_openclaw_config() -> dict:
         token = gateway.get("auth", {}).get("token")
         if token:
             result["token"] = token
-        return result
     except Exception:
         return {}
+    _OPENCLAW_CACHE = (st.st_mtime_ns, st.st_size, result)
+    return dict(result)
@@ -1,20 +1,29 @@
 """OpenClaw process detection and lifecycle management."""
 
+import atexit
 import logging
+import os
 import shutil
 import subprocess
 import tempfile
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 from urllib.parse import urlparse
 
-import httpx
+from bridge.openclaw import _close_probe_client, _get_probe_client
 
 logger = logging.getLogger("wizclaw.launcher")
 
 _STDERR_LOG = Path(tempfile.gettempdir()) / "openclaw-stderr.log"
 
+# First few readiness-poll delays, so a fast-starting openclaw is noticed
+# quickly; after these, poll_interval is used.
+_READY_BACKOFF = (0.05, 0.1, 0.25)
+
+_MISSING = object()
+
 
 class OpenClawLauncher:
     """Detect whether OpenClaw is running and start it if needed."""
@@ -26,35 +35,63 @@ class OpenClawLauncher:
         poll_interval: float = 0.5,
     ):
         self.url = url.rstrip("/")
+        self._port = urlparse(self.url).port or 18789
         self.start_timeout = start_timeout
         self.poll_interval = poll_interval
         self._process: Optional[subprocess.Popen] = None
-        self._stderr_file = None
-
-    def is_running(self) -> bool:
+        self._exe_cache = _MISSING
+        # Start the PATH scan now so it overlaps with the first health probe.
+        # Set WIZCLAW_NO_PREFLIGHT=1 to do the lookup synchronously instead.
+        self._which_future: Optional[Future] = None
+        if os.environ.get("WIZCLAW_NO_PREFLIGHT") != "1":
+            executor = ThreadPoolExecutor(max_workers=1)
+            self._which_future = executor.submit(shutil.which, "openclaw")
+            executor.shutdown(wait=False)
+
+    def is_running(self, timeout: float = 3.0) -> bool:
         """Return True if OpenClaw is reachable and healthy.
 
         Checks /v1/models first (definitive proof OpenClaw API is up).
         Falls back to root path accepting only 2xx — a 502 from a leftover
         reverse-proxy or gateway shell does NOT count as "running".
+        ``timeout`` is the budget for both probes together: the fallback
+        only gets whatever the first probe left over.
         """
+        end = time.monotonic() + timeout
         try:
-            resp = httpx.get(
-                f"{self.url}/v1/models", timeout=3.0, follow_redirects=True,
+            resp = _get_probe_client().get(
+                f"{self.url}/v1/models", timeout=timeout, follow_redirects=True,
             )
             if resp.status_code == 200:
                 return True
         except Exception:
             pass
+        remaining = end - time.monotonic()
+        if remaining <= 0:
+            return False
         try:
-            resp = httpx.get(self.url, timeout=3.0, follow_redirects=True)
+            resp = _get_probe_client().get(
+                self.url, timeout=remaining, follow_redirects=True,
+            )
             return 200 <= resp.status_code < 300
         except Exception:
             return False
 
     def find_executable(self) -> Optional[str]:
-        """Locate the openclaw binary on PATH."""
-        return shutil.which("openclaw")
+        """Locate the openclaw binary on PATH (cached after the first lookup)."""
+        if self._exe_cache is _MISSING:
+            if self._which_future is not None:
+                self._exe_cache = self._which_future.result()
+                self._which_future = None
+            else:
+                self._exe_cache = shutil.which("openclaw")
+        return self._exe_cache
+
+    def refresh_executable(self) -> Optional[str]:
+        """Forget the cached lookup and search PATH again."""
+        self._exe_cache = _MISSING
+        self._which_future = None
+        return self.find_executable()
 
     def start(self) -> bool:
         """Start openclaw gateway as a background process.
@@ -69,17 +106,26 @@ class OpenClawLauncher:
 
         logger.info("Starting openclaw gateway run ...")
         try:
-            self._stderr_file = open(_STDERR_LOG, "w", encoding="utf-8")
-            self._process = subprocess.Popen(
-                [exe, "gateway", "run"],
-                stdout=subprocess.DEVNULL,
-                stderr=self._stderr_file,
+            # A bare fd (no Python file object) is all the child needs; the
+            # parent's copy is closed as soon as the child has inherited it.
+            stderr_fd = os.open(
+                _STDERR_LOG, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600,
             )
+            try:
+                self._process = subprocess.Popen(
+                    [exe, "gateway", "run"],
+                    stdout=subprocess.DEVNULL,
+                    stderr=stderr_fd,
+                )
+            finally:
+                os.close(stderr_fd)
         except OSError as exc:
             logger.error("Failed to launch openclaw: %s", exc)
-            self._close_stderr()
             return False
 
+        # Don't leak the child if we exit without reaching terminate()
+        # (e.g. sys.exit after a failed start, or an unhandled exception).
+        atexit.register(self.terminate)
         return self._wait_until_ready()
 
     def ensure_running(self) -> bool:
@@ -93,13 +139,17 @@ class OpenClawLauncher:
         # Handle race: another process started OpenClaw while we were launching
         if success and self._process is not None and self._process.poll() is not None:
             logger.info("OpenClaw was started by another process")
-            self._close_stderr()
             self._process = None
 
         return success
 
     def terminate(self) -> None:
-        """Terminate the managed OpenClaw process if we started it."""
+        """Terminate the managed OpenClaw process if we started it.
+
+        Popen.wait returns as soon as the child is reaped, so the timeout
+        only bounds the worst case before falling back to kill().
+        """
+        atexit.unregister(self.terminate)
         if self._process is not None and self._process.poll() is None:
             logger.info("Terminating managed OpenClaw process (pid=%d)", self._process.pid)
             self._process.terminate()
@@ -107,21 +157,11 @@ class OpenClawLauncher:
                 self._process.wait(timeout=5)
             except subprocess.TimeoutExpired:
                 self._process.kill()
-        self._close_stderr()
+        _close_probe_client()
 
     def _parse_port(self) -> int:
-        """Extract port number from self.url, default 18789."""
-        parsed = urlparse(self.url)
-        return parsed.port or 18789
-
-    def _close_stderr(self) -> None:
-        """Close the stderr log file if open."""
-        if self._stderr_file is not None:
-            try:
-                self._stderr_file.close()
-            except Exception:
-                pass
-            self._stderr_file = None
+        """Port number from self.url (parsed once in __init__), default 18789."""
+        return self._port
 
     def _read_stderr_log(self) -> str:
         """Read the stderr log contents for diagnostics."""
@@ -133,10 +173,10 @@ class OpenClawLauncher:
     def _wait_until_ready(self) -> bool:
         """Poll the health endpoint until ready or timeout."""
         deadline = time.monotonic() + self.start_timeout
-        while time.monotonic() < deadline:
+        attempt = 0
+        while (remaining := deadline - time.monotonic()) > 0:
             # Check if the process exited prematurely
             if self._process is not None and self._process.poll() is not None:
-                self._close_stderr()
                 stderr_output = self._read_stderr_log()
                 logger.error(
                     "openclaw process exited with code %d",
@@ -157,13 +197,19 @@ class OpenClawLauncher:
                     return True
                 return False
 
-            if self.is_running():
+            # Keep the probes short and within the remaining time so
+            # readiness is noticed promptly and start_timeout is honoured.
+            if self.is_running(timeout=min(1.0, remaining)):
                 logger.info("OpenClaw is ready at %s", self.url)
                 return True
 
-            time.sleep(self.poll_interval)
+            if attempt < len(_READY_BACKOFF):
+                delay = min(_READY_BACKOFF[attempt], self.poll_interval)
+            else:
+                delay = self.poll_interval
+            attempt += 1
+            time.sleep(max(0.0, min(delay, deadline - time.monotonic())))
 
-        self._close_stderr()
         stderr_output = self._read_stderr_log()
         logger.error(
             "OpenClaw did not become ready within %ds",
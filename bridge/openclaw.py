@@ -1,19 +1,55 @@
 """HTTP client for the local OpenClaw agent."""
 
+import atexit
 import logging
-from typing import Optional
+import threading
+from typing import AsyncIterator, Optional
 
 import httpx
+import orjson
 
 logger = logging.getLogger("wizclaw.openclaw")
 
 _DEFAULT_TIMEOUT = 120.0
 
+_POOL_LIMITS = httpx.Limits(
+    max_connections=100, max_keepalive_connections=20, keepalive_expiry=60,
+)
+
+# Sync client shared by every health/readiness probe in the process
+# (OpenClawClient.health_check, OpenClawLauncher.is_running), so repeated
+# polling reuses one keep-alive connection.
+_probe_client: Optional[httpx.Client] = None
+_probe_lock = threading.Lock()
+
+
+def _get_probe_client() -> httpx.Client:
+    """Return the shared probe client, creating it on first use."""
+    global _probe_client
+    with _probe_lock:
+        if _probe_client is None:
+            _probe_client = httpx.Client(
+                timeout=3.0, limits=httpx.Limits(max_keepalive_connections=1),
+            )
+            atexit.register(_close_probe_client)
+        return _probe_client
+
+
+def _close_probe_client() -> None:
+    """Close the shared probe client; a later probe creates a new one."""
+    global _probe_client
+    with _probe_lock:
+        if _probe_client is not None:
+            _probe_client.close()
+            _probe_client = None
+            atexit.unregister(_close_probe_client)
+
 
 class OpenClawClient:
     """Thin wrapper around the OpenClaw HTTP API.
 
     Provides both sync (health_check) and async (aquery) methods.
+    Async connections are pooled per instance; call ``aclose()`` when done.
     """
 
     def __init__(self, base_url: str, token: str = "", agent_id: str = "main", timeout: float = _DEFAULT_TIMEOUT):
@@ -21,57 +57,131 @@ class OpenClawClient:
         self.token = token
         self.agent_id = agent_id
         self.timeout = timeout
+        self._model = f"openclaw:{agent_id}"
+        # Fixed for the client's lifetime; handed to the pooled httpx clients
+        self._static_headers = {"Content-Type": "application/json"}
+        if token:
+            self._static_headers["Authorization"] = f"Bearer {token}"
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the pooled async client, creating it on first use."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                headers=self._static_headers,
+                limits=_POOL_LIMITS,
+            )
+        return self._client
 
-    def _headers(self) -> dict:
-        headers = {"Content-Type": "application/json"}
-        if self.token:
-            headers["Authorization"] = f"Bearer {self.token}"
-        return headers
+    async def aclose(self) -> None:
+        """Close pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     async def aquery(self, user_query: str, system_prompt: Optional[str] = None) -> str:
         """Send a query to OpenClaw asynchronously and return the assistant's reply."""
-        messages = []
+        chunks = [chunk async for chunk in self._stream_choices(user_query, system_prompt)]
+        if not chunks:
+            return "[OpenClaw] No response choices returned."
+        return "".join(chunks)
+
+    async def aquery_stream(
+        self, user_query: str, system_prompt: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """Send a query and yield the assistant's reply as it is generated.
+
+        Uses the OpenAI-compatible SSE streaming mode, so the full response
+        body is never buffered.
+        """
+        async for chunk in self._stream_choices(user_query, system_prompt):
+            if chunk:
+                yield chunk
+
+    async def _stream_choices(
+        self, user_query: str, system_prompt: Optional[str],
+    ) -> AsyncIterator[str]:
+        """Yield the content of every choice received (possibly empty).
+
+        Requests streaming, but also accepts a plain JSON completion from
+        servers or proxies that ignore ``stream``.
+        """
+        user_msg = {"role": "user", "content": user_query}
         if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
-        messages.append({"role": "user", "content": user_query})
-
-        payload = {
-            "model": f"openclaw:{self.agent_id}",
-            "messages": messages,
-        }
-
-        url = f"{self.base_url}/v1/chat/completions"
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            try:
-                resp = await client.post(url, json=payload, headers=self._headers())
-                resp.raise_for_status()
-                data = resp.json()
-                choices = data.get("choices", [])
-                if not choices:
-                    return "[OpenClaw] No response choices returned."
-                return choices[0].get("message", {}).get("content", "")
-            except httpx.ConnectError:
-                raise ConnectionError(f"Cannot connect to OpenClaw at {self.base_url}")
-            except httpx.HTTPStatusError as e:
-                raise RuntimeError(f"OpenClaw returned HTTP {e.response.status_code}: {e.response.text[:500]}")
+            messages = [{"role": "system", "content": system_prompt}, user_msg]
+        else:
+            messages = [user_msg]
+        payload = {"model": self._model, "messages": messages, "stream": True}
+
+        try:
+            # Content-Type: application/json is set on the pooled client
+            async with self._get_client().stream(
+                "POST", "/v1/chat/completions", content=orjson.dumps(payload),
+            ) as resp:
+                if resp.is_error:
+                    await resp.aread()
+                    resp.raise_for_status()
+
+                if not resp.headers.get("content-type", "").startswith("text/event-stream"):
+                    await resp.aread()
+                    choices = orjson.loads(resp.content).get("choices", [])
+                    if choices:
+                        yield choices[0].get("message", {}).get("content") or ""
+                    return
+
+                async for line in resp.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    frame = orjson.loads(data)
+                    if "error" in frame:
+                        error = frame["error"]
+                        if isinstance(error, dict):
+                            error = error.get("message", error)
+                        raise RuntimeError(f"OpenClaw stream error: {error}")
+                    choices = frame.get("choices") or []
+                    if choices:
+                        yield choices[0].get("delta", {}).get("content") or ""
+        except httpx.ConnectError:
+            raise ConnectionError(f"Cannot connect to OpenClaw at {self.base_url}")
+        except httpx.HTTPStatusError as e:
+            raise RuntimeError(f"OpenClaw returned HTTP {e.response.status_code}: {e.response.text[:500]}")
 
     async def ahealth_check(self) -> bool:
         """Return True if OpenClaw is reachable (async)."""
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                resp = await client.get(f"{self.base_url}/v1/models", headers=self._headers())
-                return resp.status_code == 200
+            resp = await self._get_client().get("/v1/models", timeout=5.0)
+            return resp.status_code == 200
         except Exception:
             return False
 
     def health_check(self) -> bool:
         """Return True if OpenClaw is reachable (sync, for CLI use)."""
+        return self.check_health()[0]
+
+    def check_health(self) -> tuple[bool, str]:
+        """Probe /v1/models and return (ok, error_message) for display."""
         try:
-            resp = httpx.get(
+            resp = _get_probe_client().get(
                 f"{self.base_url}/v1/models",
-                headers=self._headers(),
+                headers=self._static_headers,
                 timeout=5.0,
             )
-            return resp.status_code == 200
-        except Exception:
-            return False
+        except httpx.ConnectError:
+            return False, f"Cannot connect to OpenClaw at {self.base_url}"
+        except httpx.TimeoutException:
+            return False, f"Connection timed out for {self.base_url}"
+        except Exception as e:
+            return False, f"Health check failed: {e}"
+        if resp.status_code == 200:
+            return True, ""
+        if resp.status_code in (401, 403):
+            return False, (
+                f"OpenClaw rejected the request (HTTP {resp.status_code}); "
+                "check the OpenClaw token"
+            )
+        return False, f"OpenClaw returned HTTP {resp.status_code}"
@@ -39,6 +39,7 @@ a = Analysis(
         "h11._writers",
         "sniffio",
         "idna",
+        "orjson",
     ],
     hookspath=[],
     hooksconfig={},